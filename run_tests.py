@@ -4,8 +4,10 @@ Test runner script for the FastAPI application.
 Provides various testing options and configurations.
 """
 
+import os
 import sys
 import subprocess
+import importlib.util
 import argparse
 from pathlib import Path
 
@@ -16,13 +18,27 @@ def run_command(cmd, description=""):
         print(f"\n🔍 {description}")
     
     print(f"Running: {' '.join(cmd)}")
-    result = subprocess.run(cmd, capture_output=False)
-    return result.returncode == 0
+    # The child inherits our stdio directly; there is nothing to capture
+    return subprocess.call(cmd, close_fds=False) == 0
+
+
+def exec_command(cmd, description=""):
+    """Replace the current process with a command; does not return."""
+    if description:
+        print(f"\n🔍 {description}")
+    
+    print(f"Running: {' '.join(cmd)}")
+    sys.stdout.flush()
+    os.execvp(cmd[0], cmd)
 
 
 def main():
     """Main test runner."""
-    parser = argparse.ArgumentParser(description="Run FastAPI tests")
+    parser = argparse.ArgumentParser(
+        description="Run FastAPI tests",
+        epilog="--lf, --ff and --nf rely on pytest's on-disk .pytest_cache; "
+               "keep it between runs (in CI, cache it keyed on the pytest "
+               "version and a hash of the test files).")
     parser.add_argument("--coverage", action="store_true", 
                        help="Run tests with coverage report")
     parser.add_argument("--verbose", "-v", action="store_true",
@@ -33,6 +49,16 @@ def main():
                        help="Run specific test file")
     parser.add_argument("--test", "-t", type=str,
                        help="Run specific test function")
+    parser.add_argument("--jobs", "-j", type=str, nargs="?", const="auto",
+                       default=None,
+                       help="Run tests in parallel with pytest-xdist "
+                            "(worker count, default: auto)")
+    parser.add_argument("--lf", action="store_true",
+                       help="Rerun only the tests that failed last time")
+    parser.add_argument("--ff", action="store_true",
+                       help="Run last failures first, then the rest")
+    parser.add_argument("--nf", action="store_true",
+                       help="Run new test files first, then the rest")
     
     args = parser.parse_args()
     
@@ -47,18 +73,39 @@ def main():
     if args.fast:
         pytest_cmd.extend(["-m", "not slow"])
     
+    # Order or select tests using the results cached from the last run
+    for flag in ("lf", "ff", "nf"):
+        if getattr(args, flag):
+            pytest_cmd.append(f"--{flag}")
+    
     # Specific file or test
     if args.file:
         pytest_cmd.append(f"tests/{args.file}")
     elif args.test:
         pytest_cmd.extend(["-k", args.test])
     
+    # Parallel execution
+    if args.jobs:
+        # Install xdist if not present
+        if importlib.util.find_spec("xdist") is None:
+            print("📦 Installing parallel test dependencies...")
+            subprocess.run([sys.executable, "-m", "pip", "install", "-q", "pytest-xdist"],
+                          check=True)
+        
+        # --dist=loadfile keeps every test of a file on the same worker: the
+        # reset_activities fixture mutates the module-global src.app.activities,
+        # which is not safe to share between tests running side by side. For
+        # finer-grained distribution use --dist=loadgroup together with
+        # @pytest.mark.xdist_group on each test class.
+        pytest_cmd.extend(["-n", args.jobs, "--dist=loadfile"])
+    
     # Coverage options
     if args.coverage:
         # Install coverage if not present
-        print("📦 Installing coverage dependencies...")
-        subprocess.run([sys.executable, "-m", "pip", "install", "pytest-cov"], 
-                      capture_output=True)
+        if importlib.util.find_spec("pytest_cov") is None:
+            print("📦 Installing coverage dependencies...")
+            subprocess.run([sys.executable, "-m", "pip", "install", "-q", "pytest-cov"],
+                          check=True)
         
         pytest_cmd.extend([
             "--cov=src",
@@ -67,6 +114,11 @@ def main():
             "--cov-fail-under=80"
         ])
     
+    # Without coverage there is no post-run work, so let pytest take over
+    # this process and report its own exit status
+    if not args.coverage and os.name == "posix":
+        exec_command(pytest_cmd, "Running FastAPI tests")
+    
     # Run the tests
     success = run_command(pytest_cmd, "Running FastAPI tests")
     
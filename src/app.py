@@ -5,78 +5,149 @@ A super simple FastAPI application that allows students to view and sign up
 for extracurricular activities at Mergington High School.
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import RedirectResponse
+from fastapi.responses import RedirectResponse, Response, StreamingResponse
+from pydantic import BaseModel
+import copy
+import gzip
+import orjson
 import os
+import threading
 from pathlib import Path
 
 app = FastAPI(title="Mergington High School API",
               description="API for viewing and signing up for extracurricular activities")
 
+# Compress larger responses; the full activities listing is compressed once per
+# change by get_activities itself, and the middleware passes it through as is
+GZIP_MINIMUM_SIZE = 1024
+app.add_middleware(GZipMiddleware, minimum_size=GZIP_MINIMUM_SIZE)
+
 # Mount the static files directory
 current_dir = Path(__file__).parent
 app.mount("/static", StaticFiles(directory=os.path.join(Path(__file__).parent,
           "static")), name="static")
 
-# In-memory activity database
-activities = {
+
+class StudentEmail(BaseModel):
+    """Request body naming a single student"""
+    email: str
+
+
+class BulkEmails(BaseModel):
+    """Request body listing several student emails at once"""
+    emails: list[str]
+
+
+# Activities the in-memory database starts from; participants are kept as
+# sets for O(1) membership checks and are sent to clients as sorted lists
+INITIAL_ACTIVITIES = {
     "Chess Club": {
         "description": "Learn strategies and compete in chess tournaments",
         "schedule": "Fridays, 3:30 PM - 5:00 PM",
         "max_participants": 12,
-        "participants": ["michael@mergington.edu", "daniel@mergington.edu"]
+        "participants": {"michael@mergington.edu", "daniel@mergington.edu"}
     },
     "Programming Class": {
         "description": "Learn programming fundamentals and build software projects",
         "schedule": "Tuesdays and Thursdays, 3:30 PM - 4:30 PM",
         "max_participants": 20,
-        "participants": ["emma@mergington.edu", "sophia@mergington.edu"]
+        "participants": {"emma@mergington.edu", "sophia@mergington.edu"}
     },
     "Gym Class": {
         "description": "Physical education and sports activities",
         "schedule": "Mondays, Wednesdays, Fridays, 2:00 PM - 3:00 PM",
         "max_participants": 30,
-        "participants": ["john@mergington.edu", "olivia@mergington.edu"]
+        "participants": {"john@mergington.edu", "olivia@mergington.edu"}
     },
     "Basketball Team": {
         "description": "Competitive basketball training and games",
         "schedule": "Tuesdays and Thursdays, 4:00 PM - 6:00 PM",
         "max_participants": 15,
-        "participants": ["alex@mergington.edu", "sarah@mergington.edu"]
+        "participants": {"alex@mergington.edu", "sarah@mergington.edu"}
     },
     "Swimming Club": {
         "description": "Learn swimming techniques and compete in meets",
         "schedule": "Mondays and Wednesdays, 3:30 PM - 5:00 PM",
         "max_participants": 25,
-        "participants": ["lucas@mergington.edu", "maya@mergington.edu"]
+        "participants": {"lucas@mergington.edu", "maya@mergington.edu"}
     },
     "Art Club": {
         "description": "Explore various art mediums including painting and drawing",
         "schedule": "Thursdays, 3:30 PM - 5:30 PM",
         "max_participants": 18,
-        "participants": ["grace@mergington.edu", "ethan@mergington.edu"]
+        "participants": {"grace@mergington.edu", "ethan@mergington.edu"}
     },
     "Drama Club": {
         "description": "Theater productions, acting, and stage performance",
         "schedule": "Mondays and Fridays, 4:00 PM - 6:00 PM",
         "max_participants": 22,
-        "participants": ["ava@mergington.edu", "noah@mergington.edu"]
+        "participants": {"ava@mergington.edu", "noah@mergington.edu"}
     },
     "Science Olympiad": {
         "description": "Compete in scientific knowledge and laboratory skills",
         "schedule": "Wednesdays, 3:30 PM - 5:00 PM",
         "max_participants": 16,
-        "participants": ["isabella@mergington.edu", "william@mergington.edu"]
+        "participants": {"isabella@mergington.edu", "william@mergington.edu"}
     },
     "Debate Team": {
         "description": "Develop public speaking and argumentation skills",
         "schedule": "Tuesdays, 3:30 PM - 5:00 PM",
         "max_participants": 14,
-        "participants": ["mia@mergington.edu", "james@mergington.edu"]
+        "participants": {"mia@mergington.edu", "james@mergington.edu"}
     }
 }
 
+# In-memory activity database
+activities = copy.deepcopy(INITIAL_ACTIVITIES)
+
+
+# Serialized /activities payload, rebuilt on the next read after any change.
+# Handlers run in a threadpool, so the generation counter lets a read tell
+# whether activities changed while it was serializing them.
+_activities_json = None
+_activities_gzip = None
+_activities_generation = 0
+_activities_cache_lock = threading.Lock()
+
+
+def _invalidate_activities_cache():
+    """Drop the cached /activities payload after activities change"""
+    global _activities_json, _activities_gzip, _activities_generation
+    with _activities_cache_lock:
+        _activities_generation += 1
+        _activities_json = None
+        _activities_gzip = None
+
+
+# Fields that can be requested from /activities; "name" is accepted but adds
+# nothing since activities are keyed by name, participants_count is derived
+ACTIVITY_FIELDS = {"name", "description", "schedule", "max_participants",
+                   "participants", "participants_count"}
+
+
+def _project_activities(fields):
+    """Return activities reduced to a comma-separated list of fields"""
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    if not requested:
+        raise HTTPException(status_code=400, detail="No fields requested")
+
+    for field in requested:
+        if field not in ACTIVITY_FIELDS:
+            raise HTTPException(status_code=400, detail=f"Unknown field: {field}")
+
+    projected = {}
+    for name, details in activities.items():
+        projected[name] = {}
+        for field in requested:
+            if field == "participants_count":
+                projected[name][field] = len(details["participants"])
+            elif field != "name":
+                projected[name][field] = details[field]
+    return projected
+
 
 @app.get("/")
 def root():
@@ -84,13 +155,66 @@ def root():
 
 
 @app.get("/activities")
-def get_activities():
-    return activities
+def get_activities(request: Request, fields: str | None = None):
+    """Get all activities, optionally projected to a comma-separated list of fields"""
+    if fields is not None:
+        return Response(content=orjson.dumps(_project_activities(fields), default=sorted),
+                        media_type="application/json")
+
+    global _activities_json, _activities_gzip
+    with _activities_cache_lock:
+        payload, compressed = _activities_json, _activities_gzip
+    if payload is None:
+        generation = _activities_generation
+        # Skip jsonable_encoder and let orjson serialize the store in one pass;
+        # participant sets are the only non-JSON type and become sorted lists
+        payload = orjson.dumps(activities, default=sorted)
+        # Compress here so cached reads don't pay for gzip on every request
+        compressed = gzip.compress(payload) if len(payload) >= GZIP_MINIMUM_SIZE else None
+        # Only cache the payload if no change happened while serializing
+        with _activities_cache_lock:
+            if generation == _activities_generation:
+                _activities_json, _activities_gzip = payload, compressed
+
+    if compressed is not None and "gzip" in request.headers.get("accept-encoding", ""):
+        return Response(content=compressed, media_type="application/json",
+                        headers={"Content-Encoding": "gzip", "Vary": "Accept-Encoding"})
+    return Response(content=payload, media_type="application/json")
+
+
+@app.get("/activities/stream")
+def stream_activities():
+    """Stream all activities as JSON, one activity at a time"""
+    async def generate():
+        yield b"{"
+        for i, (name, details) in enumerate(activities.items()):
+            if i:
+                yield b","
+            yield orjson.dumps(name) + b":" + orjson.dumps(details, default=sorted)
+        yield b"}"
+
+    return StreamingResponse(generate(), media_type="application/json")
+
+
+@app.get("/activities/{activity_name}/participants/{email}")
+def check_participant(activity_name: str, email: str):
+    """Check whether a student is signed up for an activity"""
+    # Validate activity exists
+    if activity_name not in activities:
+        raise HTTPException(status_code=404, detail="Activity not found")
+
+    # Validate student is registered
+    if email not in activities[activity_name]["participants"]:
+        raise HTTPException(status_code=404, detail="Student not registered for this activity")
+
+    return {"message": f"{email} is signed up for {activity_name}"}
 
 
 @app.post("/activities/{activity_name}/signup")
-def signup_for_activity(activity_name: str, email: str):
+def signup_for_activity(activity_name: str, body: StudentEmail):
     """Sign up a student for an activity"""
+    email = body.email
+
     # Validate activity exists
     if activity_name not in activities:
         raise HTTPException(status_code=404, detail="Activity not found")
@@ -103,13 +227,16 @@ def signup_for_activity(activity_name: str, email: str):
         raise HTTPException(status_code=400, detail="Student already signed up")
 
     # Add student
-    activity["participants"].append(email)
+    activity["participants"].add(email)
+    _invalidate_activities_cache()
     return {"message": f"Signed up {email} for {activity_name}"}
 
 
 @app.delete("/activities/{activity_name}/unregister")
-def unregister_from_activity(activity_name: str, email: str):
+def unregister_from_activity(activity_name: str, body: StudentEmail):
     """Unregister a student from an activity"""
+    email = body.email
+
     # Validate activity exists
     if activity_name not in activities:
         raise HTTPException(status_code=404, detail="Activity not found")
@@ -122,5 +249,42 @@ def unregister_from_activity(activity_name: str, email: str):
         raise HTTPException(status_code=400, detail="Student not registered for this activity")
 
     # Remove student
-    activity["participants"].remove(email)
+    activity["participants"].discard(email)
+    _invalidate_activities_cache()
     return {"message": f"Unregistered {email} from {activity_name}"}
+
+
+@app.post("/activities/{activity_name}/signup/bulk")
+def bulk_signup_for_activity(activity_name: str, body: BulkEmails):
+    """Sign up several students for an activity in one request"""
+    # Validate activity exists
+    if activity_name not in activities:
+        raise HTTPException(status_code=404, detail="Activity not found")
+
+    # Get the specific activity
+    activity = activities[activity_name]
+
+    # Skip students who are already signed up or listed more than once
+    new_emails = set(body.emails) - activity["participants"]
+
+    # Add students
+    activity["participants"] |= new_emails
+    _invalidate_activities_cache()
+    return {"message": f"Signed up {len(new_emails)} students for {activity_name}"}
+
+
+@app.delete("/activities/{activity_name}/unregister/bulk")
+def bulk_unregister_from_activity(activity_name: str, body: BulkEmails):
+    """Unregister several students from an activity in one request"""
+    # Validate activity exists
+    if activity_name not in activities:
+        raise HTTPException(status_code=404, detail="Activity not found")
+
+    # Get the specific activity
+    activity = activities[activity_name]
+
+    # Remove students, ignoring those not registered
+    leaving = activity["participants"].intersection(body.emails)
+    activity["participants"] -= leaving
+    _invalidate_activities_cache()
+    return {"message": f"Unregistered {len(leaving)} students from {activity_name}"}
@@ -2,15 +2,78 @@
 Test configuration and fixtures for FastAPI tests.
 """
 
+import copy
+import functools
+import logging
+
+import httpx
+import orjson
 import pytest
+import pytest_asyncio
 from fastapi.testclient import TestClient
 from src.app import app
 
 
-@pytest.fixture
+# Per-request log records are pure overhead under test; httpx in particular
+# logs every TestClient request at INFO
+logging.getLogger("uvicorn.access").disabled = True
+logging.getLogger("fastapi").setLevel(logging.WARNING)
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+
+@pytest.fixture(scope="session")
 def client():
-    """Create a test client for the FastAPI app."""
-    return TestClient(app)
+    """Create a test client for the FastAPI app, shared by the whole session.
+    
+    The client holds no state between requests; the activities store it talks
+    to is reset before each test by ``reset_activities``. Entering the client
+    runs the app's lifespan once for the session rather than per request.
+    """
+    with TestClient(app) as c:
+        # Warm up each route once so one-time costs (route setup, lazy
+        # imports, body model validation) stay out of timed tests
+        body = {"email": "warmup@mergington.edu"}
+        assert c.get("/activities").status_code == 200
+        assert c.get("/activities/stream").status_code == 200
+        assert c.post("/activities/Chess Club/signup", json=body).status_code == 200
+        assert c.request("DELETE", "/activities/Chess Club/unregister", json=body).status_code == 200
+        yield c
+
+
+@pytest_asyncio.fixture
+async def async_client():
+    """Create an async client that calls the app in-process over ASGI.
+    
+    Unlike ``client`` it has no sync-to-async portal in between, so requests
+    can genuinely overlap with ``asyncio.gather``.
+    """
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        yield c
+
+
+@pytest.fixture
+def baseline_activities(client):
+    """Activities as returned by the API right after the per-test reset."""
+    return orjson.loads(client.get("/activities").content)
+
+
+@functools.lru_cache(maxsize=None)
+def _expected_signup_message(activity_name, email):
+    return f"Signed up {email} for {activity_name}"
+
+
+@pytest.fixture(scope="session")
+def expected_signup_message():
+    """Return the message the signup endpoint produces for an activity/email."""
+    return _expected_signup_message
+
+
+@pytest.fixture
+def state():
+    """The app's in-memory activities store, for asserting on state directly."""
+    from src.app import activities
+    return activities
 
 
 @pytest.fixture
@@ -32,76 +95,33 @@ def sample_activities():
     }
 
 
-@pytest.fixture(autouse=True)
-def reset_activities():
-    """Reset activities to original state before each test."""
-    from src.app import activities
+def _reset_activities():
+    """Restore the app's activities store to its original state."""
+    from src.app import INITIAL_ACTIVITIES, activities, _invalidate_activities_cache
     
-    # Store original activities
-    original_activities = {
-        "Chess Club": {
-            "description": "Learn strategies and compete in chess tournaments",
-            "schedule": "Fridays, 3:30 PM - 5:00 PM",
-            "max_participants": 12,
-            "participants": ["michael@mergington.edu", "daniel@mergington.edu"]
-        },
-        "Programming Class": {
-            "description": "Learn programming fundamentals and build software projects",
-            "schedule": "Tuesdays and Thursdays, 3:30 PM - 4:30 PM",
-            "max_participants": 20,
-            "participants": ["emma@mergington.edu", "sophia@mergington.edu"]
-        },
-        "Gym Class": {
-            "description": "Physical education and sports activities",
-            "schedule": "Mondays, Wednesdays, Fridays, 2:00 PM - 3:00 PM",
-            "max_participants": 30,
-            "participants": ["john@mergington.edu", "olivia@mergington.edu"]
-        },
-        "Basketball Team": {
-            "description": "Competitive basketball training and games",
-            "schedule": "Tuesdays and Thursdays, 4:00 PM - 6:00 PM",
-            "max_participants": 15,
-            "participants": ["alex@mergington.edu", "sarah@mergington.edu"]
-        },
-        "Swimming Club": {
-            "description": "Learn swimming techniques and compete in meets",
-            "schedule": "Mondays and Wednesdays, 3:30 PM - 5:00 PM",
-            "max_participants": 25,
-            "participants": ["lucas@mergington.edu", "maya@mergington.edu"]
-        },
-        "Art Club": {
-            "description": "Explore various art mediums including painting and drawing",
-            "schedule": "Thursdays, 3:30 PM - 5:30 PM",
-            "max_participants": 18,
-            "participants": ["grace@mergington.edu", "ethan@mergington.edu"]
-        },
-        "Drama Club": {
-            "description": "Theater productions, acting, and stage performance",
-            "schedule": "Mondays and Fridays, 4:00 PM - 6:00 PM",
-            "max_participants": 22,
-            "participants": ["ava@mergington.edu", "noah@mergington.edu"]
-        },
-        "Science Olympiad": {
-            "description": "Compete in scientific knowledge and laboratory skills",
-            "schedule": "Wednesdays, 3:30 PM - 5:00 PM",
-            "max_participants": 16,
-            "participants": ["isabella@mergington.edu", "william@mergington.edu"]
-        },
-        "Debate Team": {
-            "description": "Develop public speaking and argumentation skills",
-            "schedule": "Tuesdays, 3:30 PM - 5:00 PM",
-            "max_participants": 14,
-            "participants": ["mia@mergington.edu", "james@mergington.edu"]
-        }
-    }
-    
-    # Reset activities to original state
     activities.clear()
-    activities.update(original_activities)
+    activities.update(copy.deepcopy(INITIAL_ACTIVITIES))
+    _invalidate_activities_cache()
+
+
+@pytest.fixture(scope="class")
+def class_activities():
+    """Reset activities once for a whole test class."""
+    _reset_activities()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def reset_activities(request):
+    """Reset activities to original state before each test.
+    
+    Tests marked ``shared_state`` share a single reset per class instead;
+    each of them must undo its own changes before returning.
+    """
+    if request.node.get_closest_marker("shared_state"):
+        request.getfixturevalue("class_activities")
+    else:
+        _reset_activities()
     
     # Yield control to the test
     yield
-    
-    # Clean up after test (optional, since autouse will reset anyway)
-    activities.clear()
-    activities.update(original_activities)
\ No newline at end of file
@@ -0,0 +1,10 @@
+"""
+Expected data shared by the test modules, kept independent of the app.
+"""
+
+
+EXPECTED_ACTIVITIES = frozenset({
+    "Chess Club", "Programming Class", "Gym Class",
+    "Basketball Team", "Swimming Club", "Art Club",
+    "Drama Club", "Science Olympiad", "Debate Team"
+})
@@ -2,8 +2,17 @@
 Test cases for the FastAPI endpoints.
 """
 
+from types import SimpleNamespace
+
+import orjson
 import pytest
 from fastapi.testclient import TestClient
+from tests.expected_data import EXPECTED_ACTIVITIES
+
+
+def _json(response):
+    """Decode a response body with orjson rather than the stdlib json module."""
+    return orjson.loads(response.content)
 
 
 class TestRootEndpoint:
@@ -24,12 +33,12 @@ class TestActivitiesEndpoint:
         response = client.get("/activities")
         assert response.status_code == 200
         
-        data = response.json()
+        data = _json(response)
         assert isinstance(data, dict)
         assert len(data) > 0
         
         # Check structure of one activity
-        activity_name = list(data.keys())[0]
+        activity_name = next(iter(data))
         activity = data[activity_name]
         assert "description" in activity
         assert "schedule" in activity
@@ -37,51 +46,179 @@ class TestActivitiesEndpoint:
         assert "participants" in activity
         assert isinstance(activity["participants"], list)
     
-    def test_get_activities_contains_expected_activities(self, client: TestClient):
+    def test_get_activities_contains_expected_activities(self, baseline_activities: dict):
         """Test that response contains expected activities."""
-        response = client.get("/activities")
-        data = response.json()
+        missing = EXPECTED_ACTIVITIES - baseline_activities.keys()
+        assert not missing, f"Missing activities: {sorted(missing)}"
+    
+    def test_get_activities_participants_sorted(self, client: TestClient):
+        """Test that participants are returned as a sorted list."""
+        client.post("/activities/Chess Club/signup", json={"email": "aaron@mergington.edu"})
+        
+        data = _json(client.get("/activities"))
+        participants = data["Chess Club"]["participants"]
+        assert participants == sorted(participants)
+        assert participants[0] == "aaron@mergington.edu"
+    
+    def test_get_activities_reflects_changes(self, client: TestClient):
+        """Test that a cached response is not served after activities change."""
+        email = "fresh@mergington.edu"
+        assert email not in _json(client.get("/activities"))["Chess Club"]["participants"]
         
-        expected_activities = [
-            "Chess Club", "Programming Class", "Gym Class", 
-            "Basketball Team", "Swimming Club", "Art Club", 
-            "Drama Club", "Science Olympiad", "Debate Team"
-        ]
+        client.post("/activities/Chess Club/signup", json={"email": email})
+        assert email in _json(client.get("/activities"))["Chess Club"]["participants"]
         
-        for activity in expected_activities:
-            assert activity in data
+        client.request("DELETE", "/activities/Chess Club/unregister", json={"email": email})
+        assert email not in _json(client.get("/activities"))["Chess Club"]["participants"]
+    
+    def test_get_activities_does_not_cache_payload_raced_by_signup(self, client: TestClient, monkeypatch):
+        """Test that a payload serialized before a concurrent signup is not cached."""
+        import src.app as app_module
+        
+        email = "racer@mergington.edu"
+        real_dumps = orjson.dumps
+        raced = []
+        
+        def dumps_then_signup(*args, **kwargs):
+            payload = real_dumps(*args, **kwargs)
+            # Simulate a signup landing while the GET is still serializing
+            if not raced:
+                raced.append(True)
+                app_module.signup_for_activity("Chess Club", app_module.StudentEmail(email=email))
+            return payload
+        
+        monkeypatch.setattr(app_module, "orjson", SimpleNamespace(dumps=dumps_then_signup))
+        client.get("/activities")
+        
+        assert raced
+        assert email in _json(client.get("/activities"))["Chess Club"]["participants"]
+    
+    def test_stream_activities_matches_activities(self, client: TestClient):
+        """Test that the streamed activities equal the regular response."""
+        response = client.get("/activities/stream")
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        assert _json(response) == _json(client.get("/activities"))
+    
+    def test_get_activities_projected_fields(self, client: TestClient):
+        """Test that the fields parameter limits each activity to those fields."""
+        response = client.get("/activities?fields=schedule,participants_count")
+        assert response.status_code == 200
+        
+        data = _json(response)
+        assert data.keys() == EXPECTED_ACTIVITIES
+        assert data["Chess Club"] == {
+            "schedule": "Fridays, 3:30 PM - 5:00 PM",
+            "participants_count": 2,
+        }
+    
+    def test_get_activities_projected_fields_name_and_spaces(self, client: TestClient):
+        """Test that "name" is accepted and whitespace around fields is ignored."""
+        response = client.get("/activities?fields=name, participants_count")
+        assert response.status_code == 200
+        assert _json(response)["Chess Club"] == {"participants_count": 2}
+    
+    def test_get_activities_empty_fields(self, client: TestClient):
+        """Test that an empty fields parameter is rejected."""
+        response = client.get("/activities?fields=")
+        assert response.status_code == 400
+        assert _json(response)["detail"] == "No fields requested"
+    
+    def test_get_activities_unknown_field(self, client: TestClient):
+        """Test that requesting an unknown field fails."""
+        response = client.get("/activities?fields=schedule,nickname")
+        assert response.status_code == 400
+        assert "nickname" in _json(response)["detail"]
+
+
+class TestCompression:
+    """Test cases for gzip compression of responses."""
+    
+    def test_large_response_compressed(self, client: TestClient):
+        """Test that the activities listing (over 1 KB) is gzip-encoded."""
+        response = client.get("/activities")
+        assert response.status_code == 200
+        assert len(response.content) >= 1024
+        assert response.headers.get("content-encoding") == "gzip"
+    
+    def test_activities_compressed_once_per_change(self, client: TestClient, monkeypatch):
+        """Test that repeated reads reuse the cached gzip payload."""
+        import src.app as app_module
+        
+        calls = []
+        real_compress = app_module.gzip.compress
+        monkeypatch.setattr(app_module, "gzip", SimpleNamespace(
+            compress=lambda data: calls.append(data) or real_compress(data)))
+        
+        first = client.get("/activities")
+        second = client.get("/activities")
+        assert len(calls) == 1
+        assert second.headers.get("content-encoding") == "gzip"
+        assert "accept-encoding" in second.headers.get("vary", "").lower()
+        assert _json(first) == _json(second)
+    
+    def test_activities_uncompressed_without_gzip_accept(self, client: TestClient):
+        """Test that clients not accepting gzip get the plain listing."""
+        compressed = client.get("/activities")
+        plain = client.get("/activities", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in plain.headers
+        assert _json(plain) == _json(compressed)
+    
+    def test_small_response_not_compressed(self, client: TestClient):
+        """Test that responses under 1 KB are sent uncompressed."""
+        response = client.get("/activities?fields=participants_count")
+        assert response.status_code == 200
+        assert len(response.content) < 1024
+        assert "content-encoding" not in response.headers
+
+
+class TestParticipantEndpoint:
+    """Test cases for the participant membership endpoint."""
+    
+    def test_participant_registered(self, client: TestClient):
+        """Test checking a student who is signed up."""
+        response = client.get("/activities/Chess Club/participants/michael@mergington.edu")
+        assert response.status_code == 200
+    
+    def test_participant_not_registered(self, client: TestClient):
+        """Test checking a student who is not signed up."""
+        response = client.get("/activities/Chess Club/participants/nobody@mergington.edu")
+        assert response.status_code == 404
+        assert "not registered" in _json(response)["detail"].lower()
+    
+    def test_participant_nonexistent_activity(self, client: TestClient):
+        """Test checking membership of a non-existent activity."""
+        response = client.get("/activities/Nonexistent Activity/participants/michael@mergington.edu")
+        assert response.status_code == 404
+        assert "not found" in _json(response)["detail"].lower()
 
 
 class TestSignupEndpoint:
     """Test cases for the signup endpoint."""
     
-    def test_signup_success(self, client: TestClient):
+    def test_signup_success(self, client: TestClient, state: dict, expected_signup_message):
         """Test successful signup for an activity."""
         email = "newstudent@mergington.edu"
         activity = "Chess Club"
         
-        response = client.post(f"/activities/{activity}/signup?email={email}")
+        response = client.post(f"/activities/{activity}/signup", json={"email": email})
         assert response.status_code == 200
         
-        data = response.json()
-        assert "message" in data
-        assert email in data["message"]
-        assert activity in data["message"]
+        data = _json(response)
+        assert data["message"] == expected_signup_message(activity, email)
         
         # Verify the student was actually added
-        activities_response = client.get("/activities")
-        activities_data = activities_response.json()
-        assert email in activities_data[activity]["participants"]
+        assert email in state[activity]["participants"]
     
     def test_signup_duplicate(self, client: TestClient):
         """Test that signing up a student twice fails."""
         email = "michael@mergington.edu"  # Already in Chess Club
         activity = "Chess Club"
         
-        response = client.post(f"/activities/{activity}/signup?email={email}")
+        response = client.post(f"/activities/{activity}/signup", json={"email": email})
         assert response.status_code == 400
         
-        data = response.json()
+        data = _json(response)
         assert "detail" in data
         assert "already signed up" in data["detail"].lower()
     
@@ -90,63 +227,59 @@ class TestSignupEndpoint:
         email = "test@mergington.edu"
         activity = "Nonexistent Activity"
         
-        response = client.post(f"/activities/{activity}/signup?email={email}")
+        response = client.post(f"/activities/{activity}/signup", json={"email": email})
         assert response.status_code == 404
         
-        data = response.json()
+        data = _json(response)
         assert "detail" in data
         assert "not found" in data["detail"].lower()
     
     def test_signup_missing_email(self, client: TestClient):
-        """Test signup without providing email parameter."""
+        """Test signup without providing a request body."""
         activity = "Chess Club"
         
         response = client.post(f"/activities/{activity}/signup")
         assert response.status_code == 422  # Unprocessable Entity
     
-    def test_signup_empty_email(self, client: TestClient):
-        """Test signup with empty email parameter."""
+    def test_signup_empty_email(self, client: TestClient, state: dict):
+        """Test signup with an empty email."""
         activity = "Chess Club"
         
-        response = client.post(f"/activities/{activity}/signup?email=")
+        response = client.post(f"/activities/{activity}/signup", json={"email": ""})
         assert response.status_code == 200  # FastAPI allows empty strings
         
         # Verify empty email was added (though this might not be desired behavior)
-        activities_response = client.get("/activities")
-        activities_data = activities_response.json()
-        assert "" in activities_data[activity]["participants"]
+        assert "" in state[activity]["participants"]
 
 
 class TestUnregisterEndpoint:
     """Test cases for the unregister endpoint."""
     
-    def test_unregister_success(self, client: TestClient):
+    def test_unregister_success(self, client: TestClient, state: dict):
         """Test successful unregistration from an activity."""
         email = "michael@mergington.edu"  # Already in Chess Club
         activity = "Chess Club"
         
-        response = client.delete(f"/activities/{activity}/unregister?email={email}")
+        response = client.request("DELETE", f"/activities/{activity}/unregister", json={"email": email})
         assert response.status_code == 200
         
-        data = response.json()
+        data = _json(response)
         assert "message" in data
         assert email in data["message"]
         assert activity in data["message"]
         
         # Verify the student was actually removed
-        activities_response = client.get("/activities")
-        activities_data = activities_response.json()
-        assert email not in activities_data[activity]["participants"]
+        assert email not in state[activity]["participants"]
     
     def test_unregister_not_registered(self, client: TestClient):
         """Test unregistering a student who is not registered."""
         email = "notregistered@mergington.edu"
         activity = "Chess Club"
         
-        response = client.delete(f"/activities/{activity}/unregister?email={email}")
+        response = client.request("DELETE", f"/activities/{activity}/unregister", json={"email": email})
         assert response.status_code == 400
         
-        data = response.json()
+        data = _json(response)
         assert "detail" in data
         assert "not registered" in data["detail"].lower()
     
@@ -155,80 +288,137 @@ class TestUnregisterEndpoint:
         email = "test@mergington.edu"
         activity = "Nonexistent Activity"
         
-        response = client.delete(f"/activities/{activity}/unregister?email={email}")
+        response = client.request("DELETE", f"/activities/{activity}/unregister", json={"email": email})
         assert response.status_code == 404
         
-        data = response.json()
+        data = _json(response)
         assert "detail" in data
         assert "not found" in data["detail"].lower()
     
     def test_unregister_missing_email(self, client: TestClient):
-        """Test unregister without providing email parameter."""
+        """Test unregister without providing a request body."""
         activity = "Chess Club"
         
         response = client.delete(f"/activities/{activity}/unregister")
         assert response.status_code == 422  # Unprocessable Entity
 
 
+class TestBulkEndpoints:
+    """Test cases for the bulk signup and unregister endpoints."""
+    
+    def test_bulk_signup_success(self, client: TestClient, state: dict):
+        """Test signing up several students in one request."""
+        emails = ["bulk1@mergington.edu", "bulk2@mergington.edu"]
+        activity = "Chess Club"
+        
+        response = client.post(f"/activities/{activity}/signup/bulk", json={"emails": emails})
+        assert response.status_code == 200
+        assert _json(response)["message"] == f"Signed up 2 students for {activity}"
+        assert set(emails).issubset(state[activity]["participants"])
+    
+    def test_bulk_signup_skips_existing_and_repeated(self, client: TestClient, state: dict):
+        """Test that already registered or repeated emails are added only once."""
+        emails = ["michael@mergington.edu", "bulk@mergington.edu", "bulk@mergington.edu"]
+        activity = "Chess Club"
+        
+        response = client.post(f"/activities/{activity}/signup/bulk", json={"emails": emails})
+        assert response.status_code == 200
+        assert _json(response)["message"] == f"Signed up 1 students for {activity}"
+        assert len(state[activity]["participants"]) == 3
+    
+    def test_bulk_signup_nonexistent_activity(self, client: TestClient):
+        """Test bulk signup for a non-existent activity."""
+        response = client.post("/activities/Nonexistent Activity/signup/bulk",
+                               json={"emails": ["test@mergington.edu"]})
+        assert response.status_code == 404
+    
+    def test_bulk_signup_missing_body(self, client: TestClient):
+        """Test bulk signup without a request body."""
+        response = client.post("/activities/Chess Club/signup/bulk")
+        assert response.status_code == 422
+    
+    def test_bulk_unregister_success(self, client: TestClient, state: dict):
+        """Test unregistering several students, ignoring unknown ones."""
+        emails = ["michael@mergington.edu", "daniel@mergington.edu", "unknown@mergington.edu"]
+        activity = "Chess Club"
+        
+        response = client.request("DELETE", f"/activities/{activity}/unregister/bulk",
+                                  json={"emails": emails})
+        assert response.status_code == 200
+        assert _json(response)["message"] == f"Unregistered 2 students from {activity}"
+        assert len(state[activity]["participants"]) == 0
+    
+    def test_bulk_unregister_nonexistent_activity(self, client: TestClient):
+        """Test bulk unregister from a non-existent activity."""
+        response = client.request("DELETE", "/activities/Nonexistent Activity/unregister/bulk",
+                                  json={"emails": ["test@mergington.edu"]})
+        assert response.status_code == 404
+
+
+@pytest.mark.shared_state
 class TestIntegrationScenarios:
     """Integration test scenarios combining multiple operations."""
     
-    def test_signup_then_unregister(self, client: TestClient):
+    def test_signup_then_unregister(self, client: TestClient, state: dict):
         """Test signing up and then unregistering from an activity."""
         email = "integration@mergington.edu"
         activity = "Programming Class"
         
-        # First signup
-        signup_response = client.post(f"/activities/{activity}/signup?email={email}")
-        assert signup_response.status_code == 200
-        
-        # Verify signup worked
-        activities_response = client.get("/activities")
-        activities_data = activities_response.json()
-        assert email in activities_data[activity]["participants"]
-        
-        # Then unregister
-        unregister_response = client.delete(f"/activities/{activity}/unregister?email={email}")
-        assert unregister_response.status_code == 200
-        
-        # Verify unregistration worked
-        activities_response = client.get("/activities")
-        activities_data = activities_response.json()
-        assert email not in activities_data[activity]["participants"]
+        try:
+            # First signup
+            signup_response = client.post(f"/activities/{activity}/signup", json={"email": email})
+            assert signup_response.status_code == 200
+            
+            # Verify signup worked
+            assert email in state[activity]["participants"]
+            
+            # Then unregister
+            unregister_response = client.request("DELETE", f"/activities/{activity}/unregister", json={"email": email})
+            assert unregister_response.status_code == 200
+            
+            # Verify unregistration worked
+            assert email not in state[activity]["participants"]
+        finally:
+            # Leave the shared state as we found it, even if an assertion failed
+            client.request("DELETE", f"/activities/{activity}/unregister/bulk", json={"emails": [email]})
     
-    def test_multiple_signups_different_activities(self, client: TestClient):
+    def test_multiple_signups_different_activities(self, client: TestClient, state: dict):
         """Test signing up for multiple different activities."""
         email = "multisport@mergington.edu"
         activities_to_join = ["Chess Club", "Programming Class", "Art Club"]
         
-        for activity in activities_to_join:
-            response = client.post(f"/activities/{activity}/signup?email={email}")
-            assert response.status_code == 200
-        
-        # Verify student is in all activities
-        activities_response = client.get("/activities")
-        activities_data = activities_response.json()
-        
-        for activity in activities_to_join:
-            assert email in activities_data[activity]["participants"]
+        try:
+            for activity in activities_to_join:
+                response = client.post(f"/activities/{activity}/signup", json={"email": email})
+                assert response.status_code == 200
+            
+            # Verify student is in all activities
+            for activity in activities_to_join:
+                assert email in state[activity]["participants"]
+        finally:
+            # Leave the shared state as we found it, even if an assertion failed
+            for activity in activities_to_join:
+                client.request("DELETE", f"/activities/{activity}/unregister/bulk", json={"emails": [email]})
     
-    def test_unregister_then_signup_again(self, client: TestClient):
+    def test_unregister_then_signup_again(self, client: TestClient, state: dict):
         """Test unregistering and then signing up again for the same activity."""
         email = "michael@mergington.edu"  # Already in Chess Club
         activity = "Chess Club"
         
-        # First unregister
-        unregister_response = client.delete(f"/activities/{activity}/unregister?email={email}")
-        assert unregister_response.status_code == 200
-        
-        # Then signup again
-        signup_response = client.post(f"/activities/{activity}/signup?email={email}")
-        assert signup_response.status_code == 200
-        
-        # Verify student is back in the activity
-        activities_response = client.get("/activities")
-        activities_data = activities_response.json()
-        assert email in activities_data[activity]["participants"]
+        try:
+            # First unregister
+            unregister_response = client.request("DELETE", f"/activities/{activity}/unregister", json={"email": email})
+            assert unregister_response.status_code == 200
+            
+            # Then signup again
+            signup_response = client.post(f"/activities/{activity}/signup", json={"email": email})
+            assert signup_response.status_code == 200
+            
+            # Verify student is back in the activity
+            assert email in state[activity]["participants"]
+        finally:
+            # Leave the shared state as we found it, even if an assertion failed
+            client.post(f"/activities/{activity}/signup/bulk", json={"emails": [email]})
 
 
 class TestEdgeCases:
@@ -239,27 +429,25 @@ class TestEdgeCases:
         email = "spaces@mergington.edu"
         activity = "Programming Class"  # Has space in name
         
-        response = client.post(f"/activities/{activity}/signup?email={email}")
+        response = client.post(f"/activities/{activity}/signup", json={"email": email})
         assert response.status_code == 200
     
-    def test_email_with_special_characters(self, client: TestClient):
+    def test_email_with_special_characters(self, client: TestClient, state: dict):
         """Test emails with special characters."""
         email = "test.tag@mergington.edu"  # Use dot instead of plus for better compatibility
         activity = "Chess Club"
         
-        response = client.post(f"/activities/{activity}/signup?email={email}")
+        response = client.post(f"/activities/{activity}/signup", json={"email": email})
         assert response.status_code == 200
         
         # Verify it was added correctly
-        activities_response = client.get("/activities")
-        activities_data = activities_response.json()
-        assert email in activities_data[activity]["participants"]
+        assert email in state[activity]["participants"]
     
-    def test_url_encoded_parameters(self, client: TestClient):
-        """Test that URL-encoded parameters work correctly."""
-        email = "url%2Btest@mergington.edu"  # URL encoded +
+    def test_url_encoded_parameters(self, client: TestClient, state: dict):
+        """Test that URL-encoded activity names and raw body emails work correctly."""
+        email = "url+test@mergington.edu"  # Sent verbatim in the JSON body
         activity = "Chess%20Club"  # URL encoded space
         
-        # The TestClient should handle URL encoding automatically
-        response = client.post(f"/activities/Chess Club/signup?email=url+test@mergington.edu")
-        assert response.status_code == 200
\ No newline at end of file
+        response = client.post(f"/activities/{activity}/signup", json={"email": email})
+        assert response.status_code == 200
+        assert email in state["Chess Club"]["participants"]
\ No newline at end of file
@@ -2,49 +2,44 @@
 Test cases for data validation and business logic.
 """
 
+import asyncio
+
+import httpx
 import pytest
 from fastapi.testclient import TestClient
+from tests.expected_data import EXPECTED_ACTIVITIES
+
+
+# Activity used to exercise participant limits, and its free spots after reset
+LIMIT_TEST_ACTIVITY = "Chess Club"
+LIMIT_TEST_SPOTS_AVAILABLE = 10
+FILLER_EMAILS = [f"filler{i}@mergington.edu" for i in range(LIMIT_TEST_SPOTS_AVAILABLE)]
 
 
 class TestDataValidation:
     """Test data validation and constraints."""
     
-    def test_activity_participant_limit(self, client: TestClient):
+    def test_activity_participant_limit(self, client: TestClient, state: dict):
         """Test that activities respect participant limits."""
-        # First, get an activity with known participant limit
-        activities_response = client.get("/activities")
-        activities_data = activities_response.json()
-        
-        # Find an activity we can test with
-        test_activity = None
-        for name, details in activities_data.items():
-            current_participants = len(details["participants"])
-            max_participants = details["max_participants"]
-            if current_participants < max_participants:
-                test_activity = name
-                break
+        test_activity = LIMIT_TEST_ACTIVITY
+        max_participants = state[test_activity]["max_participants"]
         
-        assert test_activity is not None, "No activity found with available spots"
-        
-        # Get current state
-        current_participants = len(activities_data[test_activity]["participants"])
-        max_participants = activities_data[test_activity]["max_participants"]
-        spots_available = max_participants - current_participants
+        # The per-test reset guarantees a known starting point
+        assert max_participants - len(state[test_activity]["participants"]) == LIMIT_TEST_SPOTS_AVAILABLE
         
         # Fill up all remaining spots
-        for i in range(spots_available):
-            email = f"filler{i}@mergington.edu"
-            response = client.post(f"/activities/{test_activity}/signup?email={email}")
+        post = client.post
+        url = f"/activities/{test_activity}/signup"
+        for email in FILLER_EMAILS:
+            response = post(url, json={"email": email})
             assert response.status_code == 200
         
         # Verify activity is now full
-        activities_response = client.get("/activities")
-        activities_data = activities_response.json()
-        assert len(activities_data[test_activity]["participants"]) == max_participants
+        assert len(state[test_activity]["participants"]) == max_participants
         
         # Try to add one more (should still work since we don't enforce limits in current implementation)
         overflow_email = "overflow@mergington.edu"
-        response = client.post(f"/activities/{test_activity}/signup?email={overflow_email}")
+        response = client.post(f"/activities/{test_activity}/signup", json={"email": overflow_email})
         # Note: Current implementation doesn't enforce max_participants, so this will succeed
         # In a real application, you might want this to fail
         assert response.status_code == 200
@@ -53,32 +48,31 @@ class TestDataValidation:
 class TestActivityData:
     """Test activity data integrity and consistency."""
     
-    def test_all_activities_have_required_fields(self, client: TestClient):
+    @pytest.mark.parametrize("activity_name", sorted(EXPECTED_ACTIVITIES))
+    def test_all_activities_have_required_fields(self, baseline_activities: dict, activity_name: str):
         """Test that all activities have required fields."""
-        response = client.get("/activities")
-        activities_data = response.json()
+        assert activity_name in baseline_activities, f"Activity '{activity_name}' missing"
+        activity_data = baseline_activities[activity_name]
         
         required_fields = ["description", "schedule", "max_participants", "participants"]
         
-        for activity_name, activity_data in activities_data.items():
-            for field in required_fields:
-                assert field in activity_data, f"Activity '{activity_name}' missing field '{field}'"
-                
-            # Test data types
-            assert isinstance(activity_data["description"], str)
-            assert isinstance(activity_data["schedule"], str)
-            assert isinstance(activity_data["max_participants"], int)
-            assert isinstance(activity_data["participants"], list)
+        for field in required_fields:
+            assert field in activity_data, f"Activity '{activity_name}' missing field '{field}'"
             
-            # Test constraints
-            assert activity_data["max_participants"] > 0
-            assert len(activity_data["description"]) > 0
-            assert len(activity_data["schedule"]) > 0
+        # Test data types
+        assert isinstance(activity_data["description"], str)
+        assert isinstance(activity_data["schedule"], str)
+        assert isinstance(activity_data["max_participants"], int)
+        assert isinstance(activity_data["participants"], list)
+        
+        # Test constraints
+        assert activity_data["max_participants"] > 0
+        assert len(activity_data["description"]) > 0
+        assert len(activity_data["schedule"]) > 0
     
-    def test_participant_emails_format(self, client: TestClient):
+    def test_participant_emails_format(self, baseline_activities: dict):
         """Test that participant emails follow expected format."""
-        response = client.get("/activities")
-        activities_data = response.json()
+        activities_data = baseline_activities
         
         for activity_name, activity_data in activities_data.items():
             for email in activity_data["participants"]:
@@ -88,48 +82,52 @@ class TestActivityData:
                     assert "." in email.split("@")[1], f"Invalid domain in {activity_name}: {email}"
 
 
+@pytest.mark.shared_state
 class TestConcurrency:
     """Test concurrent operations."""
     
-    def test_concurrent_signups_same_activity(self, client: TestClient):
+    @pytest.mark.asyncio
+    async def test_concurrent_signups_same_activity(self, async_client: httpx.AsyncClient, state: dict):
         """Test multiple signups to the same activity don't cause issues."""
         activity = "Programming Class"
         emails = [f"concurrent{i}@mergington.edu" for i in range(5)]
         
-        # Sign up multiple students
-        responses = []
-        for email in emails:
-            response = client.post(f"/activities/{activity}/signup?email={email}")
-            responses.append(response)
-        
-        # All should succeed (assuming no duplicate emails)
-        for response in responses:
-            assert response.status_code == 200
-        
-        # Verify all students were added
-        activities_response = client.get("/activities")
-        activities_data = activities_response.json()
-        
-        for email in emails:
-            assert email in activities_data[activity]["participants"]
+        try:
+            # Sign up multiple students at the same time
+            responses = await asyncio.gather(*(
+                async_client.post(f"/activities/{activity}/signup", json={"email": email})
+                for email in emails
+            ))
+            
+            # All should succeed (assuming no duplicate emails)
+            for response in responses:
+                assert response.status_code == 200
+            
+            # Verify all students were added
+            assert set(emails).issubset(state[activity]["participants"])
+        finally:
+            # Leave the shared state as we found it, even if an assertion failed
+            await async_client.request("DELETE", f"/activities/{activity}/unregister/bulk", json={"emails": emails})
     
-    def test_signup_and_unregister_same_student(self, client: TestClient):
+    def test_signup_and_unregister_same_student(self, client: TestClient, state: dict):
         """Test signing up and immediately unregistering the same student."""
         email = "quickchange@mergington.edu"
         activity = "Art Club"
         
-        # Signup
-        signup_response = client.post(f"/activities/{activity}/signup?email={email}")
-        assert signup_response.status_code == 200
-        
-        # Immediate unregister
-        unregister_response = client.delete(f"/activities/{activity}/unregister?email={email}")
-        assert unregister_response.status_code == 200
-        
-        # Verify final state
-        activities_response = client.get("/activities")
-        activities_data = activities_response.json()
-        assert email not in activities_data[activity]["participants"]
+        try:
+            # Signup
+            signup_response = client.post(f"/activities/{activity}/signup", json={"email": email})
+            assert signup_response.status_code == 200
+            
+            # Immediate unregister
+            unregister_response = client.request("DELETE", f"/activities/{activity}/unregister", json={"email": email})
+            assert unregister_response.status_code == 200
+            
+            # Verify final state
+            assert email not in state[activity]["participants"]
+        finally:
+            # Leave the shared state as we found it, even if an assertion failed
+            client.request("DELETE", f"/activities/{activity}/unregister/bulk", json={"emails": [email]})
 
 
 class TestErrorHandling:
@@ -138,13 +136,13 @@ class TestErrorHandling:
     def test_malformed_requests(self, client: TestClient):
         """Test various malformed requests."""
         # Test with invalid characters in activity name
-        response = client.post("/activities/Invalid<>Activity/signup?email=test@mergington.edu")
+        response = client.post("/activities/Invalid<>Activity/signup", json={"email": "test@mergington.edu"})
         # Should still work as FastAPI handles URL encoding
         assert response.status_code in [200, 404]  # Either works or activity not found
         
         # Test with very long email
         long_email = "a" * 100 + "@mergington.edu"
-        response = client.post(f"/activities/Chess Club/signup?email={long_email}")
+        response = client.post("/activities/Chess Club/signup", json={"email": long_email})
         assert response.status_code == 200  # Should work unless we add validation
     
     def test_case_sensitivity(self, client: TestClient):
@@ -152,21 +150,19 @@ class TestErrorHandling:
         email = "case@mergington.edu"
         
         # Try different cases
-        response1 = client.post("/activities/chess club/signup?email=" + email)
+        response1 = client.post("/activities/chess club/signup", json={"email": email})
         assert response1.status_code == 404  # Case sensitive, should fail
         
-        response2 = client.post("/activities/Chess Club/signup?email=" + email)
+        response2 = client.post("/activities/Chess Club/signup", json={"email": email})
         assert response2.status_code == 200  # Correct case, should work
     
-    def test_unicode_handling(self, client: TestClient):
+    def test_unicode_handling(self, client: TestClient, state: dict):
         """Test Unicode characters in email addresses."""
         unicode_email = "tëst@mërgington.edu"
         activity = "Chess Club"
         
-        response = client.post(f"/activities/{activity}/signup?email={unicode_email}")
+        response = client.post(f"/activities/{activity}/signup", json={"email": unicode_email})
         assert response.status_code == 200
         
         # Verify it was stored correctly
-        activities_response = client.get("/activities")
-        activities_data = activities_response.json()
-        assert unicode_email in activities_data[activity]["participants"]
\ No newline at end of file
+        assert unicode_email in state[activity]["participants"]
\ No newline at end of file
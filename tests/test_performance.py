@@ -2,55 +2,67 @@
 Performance and load testing for the FastAPI application.
 """
 
+import asyncio
+import itertools
+from time import perf_counter
+
+import httpx
+import orjson
 import pytest
-import time
 from fastapi.testclient import TestClient
+from src.app import StudentEmail, signup_for_activity, unregister_from_activity
 
 
 class TestPerformance:
     """Basic performance tests."""
     
-    def test_get_activities_response_time(self, client: TestClient):
+    @pytest.mark.slow
+    def test_get_activities_response_time(self, benchmark, client: TestClient):
         """Test that getting activities is reasonably fast."""
-        start_time = time.time()
-        response = client.get("/activities")
-        end_time = time.time()
+        response = benchmark(client.get, "/activities")
         
         assert response.status_code == 200
-        response_time = end_time - start_time
-        assert response_time < 1.0, f"Response took {response_time:.3f}s, should be under 1s"
+        # Stats are None when xdist disables benchmarking
+        if benchmark.stats:
+            median = benchmark.stats.stats.median
+            assert median < 0.1, f"Median response took {median:.4f}s, should be under 0.1s"
     
-    def test_signup_response_time(self, client: TestClient):
+    @pytest.mark.slow
+    def test_signup_response_time(self, benchmark, client: TestClient):
         """Test that signup operations are reasonably fast."""
-        email = "performance@mergington.edu"
         activity = "Chess Club"
+        url = f"/activities/{activity}/signup"
+        
+        # Every benchmark round needs a student who is not signed up yet
+        counter = itertools.count()
+        
+        def signup():
+            return client.post(url, json={"email": f"performance{next(counter)}@mergington.edu"})
         
-        start_time = time.time()
-        response = client.post(f"/activities/{activity}/signup?email={email}")
-        end_time = time.time()
+        response = benchmark(signup)
         
         assert response.status_code == 200
-        response_time = end_time - start_time
-        assert response_time < 1.0, f"Signup took {response_time:.3f}s, should be under 1s"
+        # Stats are None when xdist disables benchmarking
+        if benchmark.stats:
+            median = benchmark.stats.stats.median
+            assert median < 0.1, f"Median signup took {median:.4f}s, should be under 0.1s"
     
-    def test_multiple_rapid_requests(self, client: TestClient):
+    @pytest.mark.asyncio
+    async def test_multiple_rapid_requests(self, async_client: httpx.AsyncClient):
         """Test handling multiple rapid requests."""
-        responses = []
-        start_time = time.time()
+        start_time = perf_counter()
         
-        # Make 10 rapid requests
-        for i in range(10):
-            response = client.get("/activities")
-            responses.append(response)
+        # Make 10 requests at the same time
+        responses = await asyncio.gather(*(async_client.get("/activities") for _ in range(10)))
         
-        end_time = time.time()
+        end_time = perf_counter()
         total_time = end_time - start_time
         
         # All requests should succeed
         for response in responses:
             assert response.status_code == 200
         
-        # Average response time should be reasonable
+        # Time per request across the batch should be reasonable
         avg_time = total_time / 10
         assert avg_time < 0.5, f"Average response time {avg_time:.3f}s too slow"
 
@@ -58,109 +70,105 @@ class TestPerformance:
 class TestLoad:
     """Load testing with multiple operations."""
     
-    def test_bulk_signups(self, client: TestClient):
+    @pytest.mark.asyncio
+    async def test_bulk_signups(self, async_client: httpx.AsyncClient):
         """Test signing up many students at once."""
         activity = "Programming Class"
         num_signups = 20
+        emails = [f"bulk{i}@mergington.edu" for i in range(num_signups)]
         
-        start_time = time.time()
+        start_time = perf_counter()
         
-        for i in range(num_signups):
-            email = f"bulk{i}@mergington.edu"
-            response = client.post(f"/activities/{activity}/signup?email={email}")
-            assert response.status_code == 200
+        response = await async_client.post(f"/activities/{activity}/signup/bulk", json={"emails": emails})
+        assert response.status_code == 200
         
-        end_time = time.time()
+        end_time = perf_counter()
         total_time = end_time - start_time
         
         # Should complete in reasonable time
         assert total_time < 10.0, f"Bulk signups took {total_time:.3f}s, too slow"
         
         # Verify all students were added
-        activities_response = client.get("/activities")
-        activities_data = activities_response.json()
+        activities_response = await async_client.get("/activities")
+        activities_data = orjson.loads(activities_response.content)
         
-        for i in range(num_signups):
-            email = f"bulk{i}@mergington.edu"
-            assert email in activities_data[activity]["participants"]
+        assert set(emails).issubset(activities_data[activity]["participants"])
     
-    def test_bulk_unregistrations(self, client: TestClient):
+    @pytest.mark.asyncio
+    async def test_bulk_unregistrations(self, async_client: httpx.AsyncClient):
         """Test unregistering many students at once."""
         activity = "Swimming Club"
         num_students = 15
+        emails = [f"bulkremove{i}@mergington.edu" for i in range(num_students)]
         
         # First, sign up the students
-        for i in range(num_students):
-            email = f"bulkremove{i}@mergington.edu"
-            response = client.post(f"/activities/{activity}/signup?email={email}")
-            assert response.status_code == 200
+        response = await async_client.post(f"/activities/{activity}/signup/bulk", json={"emails": emails})
+        assert response.status_code == 200
         
         # Then unregister them all
-        start_time = time.time()
+        start_time = perf_counter()
         
-        for i in range(num_students):
-            email = f"bulkremove{i}@mergington.edu"
-            response = client.delete(f"/activities/{activity}/unregister?email={email}")
-            assert response.status_code == 200
+        response = await async_client.request("DELETE", f"/activities/{activity}/unregister/bulk",
+                                              json={"emails": emails})
+        assert response.status_code == 200
         
-        end_time = time.time()
+        end_time = perf_counter()
         total_time = end_time - start_time
         
         # Should complete in reasonable time
         assert total_time < 10.0, f"Bulk unregistrations took {total_time:.3f}s, too slow"
         
         # Verify all students were removed
-        activities_response = client.get("/activities")
-        activities_data = activities_response.json()
+        activities_response = await async_client.get("/activities")
+        activities_data = orjson.loads(activities_response.content)
         
-        for i in range(num_students):
-            email = f"bulkremove{i}@mergington.edu"
-            assert email not in activities_data[activity]["participants"]
+        assert set(emails).isdisjoint(activities_data[activity]["participants"])
 
 
 class TestMemoryUsage:
     """Basic memory usage testing."""
     
-    def test_large_participant_lists(self, client: TestClient):
+    @pytest.mark.asyncio
+    async def test_large_participant_lists(self, async_client: httpx.AsyncClient):
         """Test handling activities with large participant lists."""
         activity = "Drama Club"
         num_participants = 100
         
         # Add many participants
-        for i in range(num_participants):
-            email = f"memory{i}@mergington.edu"
-            response = client.post(f"/activities/{activity}/signup?email={email}")
-            assert response.status_code == 200
+        emails = [f"memory{i}@mergington.edu" for i in range(num_participants)]
+        response = await async_client.post(f"/activities/{activity}/signup/bulk", json={"emails": emails})
+        assert response.status_code == 200
         
-        # Getting activities should still work efficiently
-        start_time = time.time()
-        response = client.get("/activities")
-        end_time = time.time()
+        # Streaming activities should still work efficiently
+        start_time = perf_counter()
+        response = await async_client.get("/activities/stream")
+        end_time = perf_counter()
         
         assert response.status_code == 200
         response_time = end_time - start_time
         assert response_time < 2.0, f"Large data response took {response_time:.3f}s"
         
         # Verify data integrity
-        data = response.json()
+        data = orjson.loads(response.content)
         assert len(data[activity]["participants"]) >= num_participants
+        
+        # The buffered listing is well over 1 KB, so it should be compressed
+        response = await async_client.get("/activities")
+        assert response.headers.get("content-encoding") == "gzip"
     
-    def test_repeated_operations_memory_stability(self, client: TestClient):
+    @pytest.mark.asyncio
+    async def test_repeated_operations_memory_stability(self, async_client: httpx.AsyncClient):
         """Test that repeated operations don't cause memory issues."""
         activity = "Science Olympiad"
         email = "memory_test@mergington.edu"
+        body = StudentEmail(email=email)
         
-        # Perform many signup/unregister cycles
+        # Perform many signup/unregister cycles directly against the handlers;
+        # the HTTP path is already covered by the signup and unregister tests
         for cycle in range(20):
-            # Signup
-            signup_response = client.post(f"/activities/{activity}/signup?email={email}")
-            assert signup_response.status_code == 200
-            
-            # Unregister
-            unregister_response = client.delete(f"/activities/{activity}/unregister?email={email}")
-            assert unregister_response.status_code == 200
+            signup_for_activity(activity, body)
+            unregister_from_activity(activity, body)
         
         # Final state should be clean
-        final_response = client.get("/activities")
-        final_data = final_response.json()
-        assert email not in final_data[activity]["participants"]
\ No newline at end of file
+        final_response = await async_client.get(f"/activities/{activity}/participants/{email}")
+        assert final_response.status_code == 404